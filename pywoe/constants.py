@@ -3,7 +3,12 @@
 Constants used throughout the package.
 """
 
-INFINITY = 1e20
+import math
+
+from types import MappingProxyType
+from typing import Any, Mapping
+
+INFINITY = math.inf
 """
 A value for infinity.
 """
@@ -13,20 +18,34 @@ NUMERIC_ACCURACY = 1e-6
 The minimun difference between floats needed to deem them equal.
 """
 
-DEFAULT_DECISION_TREE_CLASSIFIER_INIT_KWARGS = {
+DEFAULT_DECISION_TREE_CLASSIFIER_INIT_KWARGS = MappingProxyType({
     "criterion": "gini",
     "max_depth": 5,
     "min_samples_leaf": 0.1
-}
+})
 """
 The keyword argument dictionary that will be passed to the decision tree class
-at instantiation, by default if the user does not override.
+at instantiation, by default if the user does not override. It's read-only, so that
+the shared default can't be mutated by accident.
 """
 
-DEFAULT_DECISION_TREE_CLASSIFIER_FIT_KWARGS = {}
+DEFAULT_DECISION_TREE_CLASSIFIER_FIT_KWARGS: Mapping[str, Any] = MappingProxyType({})
 """
 The keyword argument dictionary that will be passed to the decision tree class
 at the call to `tree.fit(...)` method, by default if the user does not override.
+It's read-only, so that the shared default can't be mutated by accident.
+"""
+
+DEFAULT_HISTOGRAM_BINNER_MAX_BINS = 255
+"""
+The maximum number of quantile bins a feature is quantised into before a tree is fitted on it,
+by default if the user does not override.
+"""
+
+DEFAULT_QUANTILE_BINNER_MAX_BINS = 20
+"""
+The maximum number of equal-frequency bins a feature is split into when no tree is fitted,
+by default if the user does not override.
 """
 
 P_VALUE_THRESHOLD = 0.05
@@ -4,27 +4,72 @@ Basic classes used as simple building blocks elsewhere.
 """
 
 import attr
+import functools
+import math
 
-from typing import FrozenSet
+from typing import FrozenSet, Iterable, Optional
 from pywoe.constants import INFINITY
 
+_HASH_CACHE_FIELD = "_attrs_cached_hash"
+"""
+The slot `attrs` uses to store the cached hash of an instance.
+"""
+
+_EMPTY_FROZENSET: FrozenSet[str] = frozenset()
+"""
+The canonical empty set of categorical indicators, shared by all numeric-only ranges.
+"""
 
-def _x_smaller_than_infinity(instance, attribute, value):
+
+def _to_optional_float(value) -> Optional[float]:
     """
-    Custom validator.
+    Custom converter, turning a value into a float unless it's `None`.
 
-    :param instance: the `attrs` class instance
-    :param attribute: the attribute
     :param value: the attribute value
+    :return: the value as a float, or `None`
     """
 
-    if value is not None:
+    return None if value is None else float(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _intern_frozenset(values: FrozenSet) -> FrozenSet:
+    """
+    Returns the first seen frozenset equal to the one provided, so that ranges sharing the same
+    categorical indicators share a single object, and comparing them is an identity check.
+
+    :param values: the frozenset to intern
+    :return: the canonical frozenset equal to the one provided
+    """
+
+    return values
+
+
+def _to_interned_frozenset(values: Iterable) -> FrozenSet:
+    """
+    Custom converter, turning an iterable into an interned frozenset.
+
+    :param values: the attribute value
+    :return: the canonical frozenset holding the values
+    """
 
-        if value >= INFINITY:
-            raise ValueError("Each numeric value has to be smaller than infinity (={})".format(INFINITY))
+    values = frozenset(values)
+    return _EMPTY_FROZENSET if not values else _intern_frozenset(values)
 
 
-@attr.s(frozen=True)
+def _is_finite_or_missing(value: Optional[float]) -> bool:
+    """
+    Checks that a numeric value is either finite or not specified at all, e.g. the bounds of
+    a purely categorical range.
+
+    :param value: the numeric value, or `None` if it's not specified
+    :return: `False` if the value is infinite (either sign), `True` otherwise
+    """
+
+    return not math.isinf(value) if value is not None else True
+
+
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class Range(object):
     """
     A definition of the boundaries of a single range. Used to define a bin, a feature range.
@@ -32,24 +77,16 @@ class Range(object):
     numeric range parts.
     """
 
-    numeric_range_start: float = attr.ib(
-        validator=[
-            attr.validators.instance_of((float, type(None))),
-            _x_smaller_than_infinity
-        ],
-        converter=lambda x: float(x) if x is not None else x,
+    numeric_range_start: Optional[float] = attr.ib(
+        converter=_to_optional_float,
         default=None
     )
     """
     The place where numeric range starts.
     """
 
-    numeric_range_end: float = attr.ib(
-        validator=[
-            attr.validators.instance_of((float, type(None))),
-            _x_smaller_than_infinity
-        ],
-        converter=lambda x: float(x) if x is not None else x,
+    numeric_range_end: Optional[float] = attr.ib(
+        converter=_to_optional_float,
         default=None
     )
     """
@@ -61,8 +98,8 @@ class Range(object):
             member_validator=attr.validators.instance_of(str),
             iterable_validator=attr.validators.instance_of(frozenset)
         ),
-        converter=frozenset,
-        default=frozenset()
+        converter=_to_interned_frozenset,
+        default=_EMPTY_FROZENSET
     )
     """
     The set of categorical/char values in the range.
@@ -70,19 +107,62 @@ class Range(object):
 
     def __attrs_post_init__(self) -> None:
         """
-        A hook to check that the range is well-defined.
+        A hook to check that the range is well-defined. All the numeric checks are done here at once,
+        rather than in per-attribute validators, since ranges are constructed very often.
+
+        :raises: :any:`ValueError`
         """
 
+        if not (
+                _is_finite_or_missing(self.numeric_range_start) and
+                _is_finite_or_missing(self.numeric_range_end)
+        ):
+            raise ValueError(
+                f"Numeric range bounds have to be either finite or missing, i.e. strictly between -{INFINITY} "
+                f"and {INFINITY}: start = {self.numeric_range_start}, end = {self.numeric_range_end}"
+            )
+
         if self.numeric_range_start is not None and self.numeric_range_end is not None:
 
             if self.numeric_range_start > self.numeric_range_end:
-                raise ValueError("Numeric range ends before it starts: start = {start}, end = {end}".format(
-                    start=self.numeric_range_start,
-                    end=self.numeric_range_end
-                ))
+                raise ValueError(
+                    f"Numeric range ends before it starts: start = {self.numeric_range_start}, "
+                    f"end = {self.numeric_range_end}"
+                )
 
         elif self.numeric_range_start is not None and self.numeric_range_end is None:
             raise ValueError("Both numeric range start and end have to be specified!")
 
         elif self.numeric_range_start is None and self.numeric_range_end is not None:
             raise ValueError("Both numeric range start and end have to be specified!")
+
+    @classmethod
+    def _unchecked(
+            cls,
+            numeric_range_start: Optional[float] = None,
+            numeric_range_end: Optional[float] = None,
+            categorical_indicators: Iterable[str] = _EMPTY_FROZENSET
+    ) -> "Range":
+        """
+        Builds a range bypassing conversion and validation. Only to be used by internal code that
+        generates ranges from values that are already known to be valid, e.g. decision tree thresholds
+        within a validated feature range.
+
+        :param numeric_range_start: the place where numeric range starts, a float or `None`
+        :param numeric_range_end: the place where numeric range ends, a float or `None`
+        :param categorical_indicators: the set of categorical/char values in the range
+        :return: a range instance
+        """
+
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "numeric_range_start", numeric_range_start)
+        object.__setattr__(instance, "numeric_range_end", numeric_range_end)
+        object.__setattr__(instance, "categorical_indicators", _to_interned_frozenset(categorical_indicators))
+        object.__setattr__(instance, _HASH_CACHE_FIELD, None)
+        return instance
+
+
+_IS_RANGE = attr.validators.instance_of(Range)
+"""
+A validator checking that a value is a :class:`Range`, shared by the data models holding ranges.
+"""
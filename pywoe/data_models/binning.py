@@ -6,13 +6,25 @@ and possible to easily re-apply across different datasets.
 
 import attr
 
-from typing import FrozenSet
-from pywoe.data_models.base import Range
+from typing import Iterable, Tuple
+from pywoe.data_models.base import Range, _IS_RANGE
 from pywoe.data_models.feature import Feature
-from pywoe.data_models.utils import check_validity_of_ranges
+from pywoe.data_models.utils import check_validity_of_ranges, range_sort_key
 
 
-@attr.s(frozen=True)
+def _to_sorted_bins(bins: Iterable[Range]) -> Tuple[Range, ...]:
+    """
+    Custom converter, turning an iterable of bins into a tuple sorted by the numeric start.
+    Repeated bins are collapsed into one.
+
+    :param bins: the attribute value
+    :return: the sorted tuple of distinct bins
+    """
+
+    return tuple(sorted(set(bins), key=range_sort_key))
+
+
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class BinningSpec(object):
     """
     A template that defines binning for a feature.
@@ -25,15 +37,16 @@ class BinningSpec(object):
     The feature to which binning is applied.
     """
 
-    bins: FrozenSet[Range] = attr.ib(
+    bins: Tuple[Range, ...] = attr.ib(
         validator=attr.validators.deep_iterable(
-            member_validator=attr.validators.instance_of(Range),
-            iterable_validator=attr.validators.instance_of(frozenset)
+            member_validator=_IS_RANGE,
+            iterable_validator=attr.validators.instance_of(tuple)
         ),
-        converter=frozenset
+        converter=_to_sorted_bins
     )
     """
-    The specification of bins.
+    The specification of bins, sorted by the start of their numeric range; the purely categorical bins
+    come last.
     """
 
     def __attrs_post_init__(self) -> None:
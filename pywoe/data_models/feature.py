@@ -6,10 +6,10 @@ Feature specification, allowing us to serialise information we learn about a fea
 
 import attr
 
-from pywoe.data_models.base import Range
+from pywoe.data_models.base import Range, _IS_RANGE
 
 
-@attr.s(frozen=True)
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class Feature(object):
     """
     A definition of the boundaries of a single feature.
@@ -23,7 +23,7 @@ class Feature(object):
     """
 
     range: Range = attr.ib(
-        validator=attr.validators.instance_of(Range)
+        validator=_IS_RANGE
     )
     """
     The range of the feature.
@@ -3,137 +3,148 @@
 Utility methods used in definitions of data models.
 """
 
-import itertools
+import math
 
-from typing import FrozenSet, List
-from collections import Counter
+from typing import Iterable, List, Tuple
 from pywoe.data_models.base import Range
 from pywoe.data_models.feature import Feature
 from pywoe.constants import NUMERIC_ACCURACY
 
 
+def range_sort_key(bin: Range) -> Tuple[float, Tuple[str, ...]]:
+    """
+    A sort key ordering ranges by their numeric start, with the purely categorical ranges last,
+    ordered by their categorical indicators.
+
+    :param bin: the range to be sorted
+    :return: the sort key of the range
+    """
+
+    start = bin.numeric_range_start
+
+    return (
+        start if start is not None else math.inf,
+        tuple(sorted(bin.categorical_indicators))
+    )
+
+
 def check_validity_of_ranges(
         feature: Feature,
-        bin_ranges: FrozenSet[Range],
+        bin_ranges: Iterable[Range],
         numeric_accuracy: float = NUMERIC_ACCURACY
 ) -> None:
     """
-    Checks if a defined set of ranges is applicable to a feature.
+    Checks if a defined set of ranges is applicable to a feature. The ranges are best provided
+    sorted by their numeric start, as the binning and WoE specs store them, otherwise they're sorted here.
 
     :param feature: the feature in question
-    :param bin_ranges: the set of ranges we want to check
+    :param bin_ranges: the ranges we want to check
     :param numeric_accuracy: the minimum difference of floats needed to deem them equal
     :raises: :any:`ValueError` in case the range is not valid
     """
 
-    all_bin_starts = [
-        bin.numeric_range_start for bin in bin_ranges if bin.numeric_range_start is not None
-    ]
-    all_bin_ends = [
-        bin.numeric_range_end for bin in bin_ranges if bin.numeric_range_end is not None
-    ]
+    feature_name = feature.name
+    feature_start = feature.range.numeric_range_start
+    feature_end = feature.range.numeric_range_end
+    feature_chars = feature.range.categorical_indicators
 
-    if len(all_bin_starts) > 0 and len(all_bin_ends) > 0:
-        min_numeric = min(all_bin_starts)
-        max_numeric = max(all_bin_ends)
+    # A single pass over the bins, collecting the numeric bounds, their maximum and all categorical indicators,
+    # noting whether any indicator appears in more than one bin.
+    numeric_bounds: List[Tuple[float, float]] = []
+    numeric_bounds_are_sorted = True
+    previous_start = -math.inf
+    max_numeric = -math.inf
+    all_chars = set()
+    has_repeated_chars = False
 
-    else:
-        min_numeric = feature.range.numeric_range_start
-        max_numeric = feature.range.numeric_range_end
+    for bin in bin_ranges:
+        start = bin.numeric_range_start
+        end = bin.numeric_range_end
 
-    all_chars = list(
-        itertools.chain.from_iterable(
-            bin.categorical_indicators for bin in bin_ranges
-        )
-    )
-    set_difference = feature.range.categorical_indicators - frozenset(all_chars)
+        if start is not None and end is not None:
+            numeric_bounds.append((start, end))
 
-    if abs(min_numeric - feature.range.numeric_range_start) > NUMERIC_ACCURACY:
-        raise ValueError(
-            "The minimum numeric value for feature `{name}` is well beyond the range startpoint ".format(
-                name=feature.name
-            ) + "({value1}, range startpoint {value2}).".format(
-                value1=min_numeric,
-                value2=feature.range.numeric_range_start
+            if start < previous_start:
+                numeric_bounds_are_sorted = False
+
+            previous_start = start
+            max_numeric = end if end > max_numeric else max_numeric
+
+        for char in bin.categorical_indicators:
+
+            if char in all_chars:
+                has_repeated_chars = True
+
+            else:
+                all_chars.add(char)
+
+    if not numeric_bounds_are_sorted:
+        numeric_bounds.sort()
+
+    set_difference = feature_chars - all_chars
+
+    if len(numeric_bounds) > 0:
+
+        if feature_start is None or feature_end is None:
+            raise ValueError(
+                f"Feature `{feature_name}` has no numeric range, yet some of its bins have a numeric part."
             )
-        )
 
-    elif abs(max_numeric - feature.range.numeric_range_end) > NUMERIC_ACCURACY:
-        raise ValueError(
-            "The maximum numeric value for feature `{name}` is well beyond the range endpoint ".format(
-                name=feature.name
-            ) + "({value1}, range endpoint {value2}).".format(
-                value1=max_numeric,
-                value2=feature.range.numeric_range_end
+        min_numeric = numeric_bounds[0][0]
+
+        if abs(min_numeric - feature_start) > NUMERIC_ACCURACY:
+            raise ValueError(
+                f"The minimum numeric value for feature `{feature_name}` is well beyond the range startpoint "
+                f"({min_numeric}, range startpoint {feature_start})."
             )
-        )
 
-    elif len(set_difference) > 0:
-        raise ValueError(
-            "Some categorical indicators in feature `{name}` are missing from binning spec: {set}.".format(
-                name=feature.name,
-                set=list(set_difference)
+        elif abs(max_numeric - feature_end) > NUMERIC_ACCURACY:
+            raise ValueError(
+                f"The maximum numeric value for feature `{feature_name}` is well beyond the range endpoint "
+                f"({max_numeric}, range endpoint {feature_end})."
             )
+
+    if len(set_difference) > 0:
+        raise ValueError(
+            f"Some categorical indicators in feature `{feature_name}` are missing from binning spec: "
+            f"{list(set_difference)}."
         )
 
-    elif _categorical_value_intersection(all_chars):
+    elif has_repeated_chars:
         raise ValueError(
-            "Some categorical indicators in feature `{name}` are specified in multiple bins.".format(
-                name=feature.name
-            )
+            f"Some categorical indicators in feature `{feature_name}` are specified in multiple bins."
         )
 
-    elif _numeric_range_is_disjoint(bin_ranges, numeric_accuracy):
+    elif _numeric_range_is_disjoint(numeric_bounds, numeric_accuracy):
         raise ValueError(
             "The numeric ranges of bins either contains gaps or overlaps."
         )
 
 
 def _numeric_range_is_disjoint(
-        bin_ranges: FrozenSet[Range],
+        numeric_bounds: List[Tuple[float, float]],
         numeric_accuracy: float
 ) -> bool:
     """
     A method that checks if the numeric range bins are disjoint and don't contain gaps.
+    Each bin's end is compared to the start of the next one, so the start and end of a bin are never separated.
 
-    :param bin_ranges: the set of ranges we want to check
+    :param numeric_bounds: the `(start, end)` pairs of the numeric parts of the bins, sorted by their start
     :param numeric_accuracy: the minimum difference of floats needed to deem them equal
     :return: `True` if the range is disjoint, `False` otherwise
     """
 
-    bin_starts = sorted(
-        [bin.numeric_range_start for bin in bin_ranges if bin.numeric_range_start is not None]
-    )
-    bin_ends = sorted(
-        [bin.numeric_range_end for bin in bin_ranges if bin.numeric_range_end is not None]
-    )
-
-    if len(bin_starts) <= 1:
+    if len(numeric_bounds) <= 1:
         return False
 
     else:
+        previous_end = numeric_bounds[0][1]
 
-        for i, bin_start in enumerate(bin_starts[1:]):
+        for i in range(1, len(numeric_bounds)):
 
-            if abs(bin_ends[i] - bin_start) > numeric_accuracy:
+            if abs(previous_end - numeric_bounds[i][0]) > numeric_accuracy:
                 return True
 
-        return False
-
-
-def _categorical_value_intersection(
-        all_chars: List
-) -> bool:
-    """
-    A method that finds if there are items that appear more than once in a list
-
-    :param all_chars: the list we want to check
-    :return: `True` if there is an intersection, `False` otherwise
-    """
+            previous_end = numeric_bounds[i][1]
 
-    if len(all_chars) > 0:
-        maximum_count = max(Counter(all_chars).values())
-        return maximum_count > 1
-
-    else:
         return False
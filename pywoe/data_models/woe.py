@@ -5,13 +5,13 @@ Data models for serialising Weight-of-Evidence transformation information.
 
 import attr
 
-from typing import FrozenSet
-from pywoe.data_models.base import Range
+from typing import Iterable, Tuple
+from pywoe.data_models.base import Range, _IS_RANGE
 from pywoe.data_models.feature import Feature
-from pywoe.data_models.utils import check_validity_of_ranges
+from pywoe.data_models.utils import check_validity_of_ranges, range_sort_key
 
 
-@attr.s(frozen=True)
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class WoEBin(object):
     """
     A definition of the boundaries of a single bin.
@@ -50,14 +50,43 @@ class WoEBin(object):
     """
 
     bin: Range = attr.ib(
-        validator=attr.validators.instance_of(Range)
+        validator=_IS_RANGE
     )
     """
     The bin to which the WoE transformation will be applied to.
     """
 
 
-@attr.s(frozen=True)
+_IS_WOEBIN = attr.validators.instance_of(WoEBin)
+"""
+A shared validator checking that a value is a :class:`WoEBin`.
+"""
+
+
+def _woe_bin_sort_key(woe_bin: WoEBin) -> Tuple:
+    """
+    A sort key ordering WoE bins the same way their ranges are ordered.
+
+    :param woe_bin: the WoE bin to be sorted
+    :return: the sort key of the WoE bin
+    """
+
+    return range_sort_key(woe_bin.bin)
+
+
+def _to_sorted_woe_bins(bins: Iterable[WoEBin]) -> Tuple[WoEBin, ...]:
+    """
+    Custom converter, turning an iterable of WoE bins into a tuple sorted by the numeric start.
+    Repeated WoE bins are collapsed into one.
+
+    :param bins: the attribute value
+    :return: the sorted tuple of distinct WoE bins
+    """
+
+    return tuple(sorted(set(bins), key=_woe_bin_sort_key))
+
+
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class WoESpec(object):
     """
     A template that defines binning for a feature.
@@ -70,15 +99,16 @@ class WoESpec(object):
     The feature to which WoE transformation is applied.
     """
 
-    bins: FrozenSet[WoEBin] = attr.ib(
+    bins: Tuple[WoEBin, ...] = attr.ib(
         validator=attr.validators.deep_iterable(
-            member_validator=attr.validators.instance_of(WoEBin),
-            iterable_validator=attr.validators.instance_of(frozenset)
+            member_validator=_IS_WOEBIN,
+            iterable_validator=attr.validators.instance_of(tuple)
         ),
-        converter=frozenset
+        converter=_to_sorted_woe_bins
     )
     """
-    The specification of bins and WoE values applied to them.
+    The specification of bins and WoE values applied to them, sorted by the start of their numeric range;
+    the purely categorical bins come last.
     """
 
     def __attrs_post_init__(self) -> None:
@@ -90,7 +120,7 @@ class WoESpec(object):
 
         check_validity_of_ranges(
             feature=self.feature,
-            bin_ranges=set([
+            bin_ranges=tuple(
                 bin.bin for bin in self.bins
-            ])
+            )
         )
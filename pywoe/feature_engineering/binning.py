@@ -4,46 +4,103 @@ A set of binner classes that function as a parameter to :class:`WoETransformer`
 define the binning algorithm.
 """
 
+import heapq
+import logging
 import pandas as pd
 import numpy as np
 
-from typing import Dict, AnyStr, Callable
+from typing import Dict, AnyStr, Callable, List, Mapping, Optional, Tuple
 from abc import ABC, abstractmethod
+from joblib import Parallel, delayed
 from sklearn.tree import DecisionTreeClassifier
-from statsmodels.stats import proportion
+from scipy import special
 from pywoe.data_models.base import Range
 from pywoe.data_models.binning import BinningSpec
 from pywoe.feature_engineering.validator import FeatureValidator
 from pywoe.feature_engineering.utils import \
     retrieve_initial_bins_from_tree, \
-    get_mask_from_range
+    retrieve_initial_bins_from_thresholds, \
+    retrieve_thresholds_from_tree, \
+    get_bin_indices, \
+    compile_binning, \
+    prepare_series
 from pywoe.constants import \
     DEFAULT_DECISION_TREE_CLASSIFIER_INIT_KWARGS, \
     DEFAULT_DECISION_TREE_CLASSIFIER_FIT_KWARGS, \
+    DEFAULT_HISTOGRAM_BINNER_MAX_BINS, \
+    DEFAULT_QUANTILE_BINNER_MAX_BINS, \
     P_VALUE_THRESHOLD
 
+logger = logging.getLogger(__name__)
+
 
 def _proportion_z_test_returning_p_value(
-        event_count_bin_1: int,
-        event_count_bin_2: int,
-        obs_count_bin_1: int,
-        obs_count_bin_2: int
-) -> float:
+        event_counts_bin_1: np.ndarray,
+        event_counts_bin_2: np.ndarray,
+        obs_counts_bin_1: np.ndarray,
+        obs_counts_bin_2: np.ndarray
+) -> np.ndarray:
+    """
+    A two-sided two-proportion z-test with a pooled proportion, run for many pairs of bins at once. It
+    returns the same p-values as the `statsmodels` proportions z-test, including NaN for the pairs whose
+    pooled variance is zero, which are never merged.
+
+    :param event_counts_bin_1: the total number of events (e.g. bads) in the first bins of the pairs
+    :param event_counts_bin_2: the total number of events (e.g. bads) in the second bins of the pairs
+    :param obs_counts_bin_1: the total number of observations in the first bins of the pairs
+    :param obs_counts_bin_2: the total number of observations in the second bins of the pairs
+    :return: an array holding the p-value of the test for every pair
     """
-    A wrapper around the `statsmodels` proportions z-test to only return p-value.
 
-    :param event_count_bin_1: the total number of events (e.g. bads) in bin 1
-    :param event_count_bin_2: the total number of events (e.g. bads) in bin 2
-    :param obs_count_bin_1: the total number of observatons in bin 1
-    :param obs_count_bin_2: the total number of observations in bin 2
-    :return: a single float, the p-value of the test
+    event_counts_bin_1 = np.asarray(event_counts_bin_1, dtype=np.float64)
+    event_counts_bin_2 = np.asarray(event_counts_bin_2, dtype=np.float64)
+    obs_counts_bin_1 = np.asarray(obs_counts_bin_1, dtype=np.float64)
+    obs_counts_bin_2 = np.asarray(obs_counts_bin_2, dtype=np.float64)
+    pooled = (event_counts_bin_1 + event_counts_bin_2) / (obs_counts_bin_1 + obs_counts_bin_2)
+    difference = event_counts_bin_1 / obs_counts_bin_1 - event_counts_bin_2 / obs_counts_bin_2
+    standard_error = np.sqrt(pooled * (1 - pooled) * (1 / obs_counts_bin_1 + 1 / obs_counts_bin_2))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 2 * special.ndtr(-np.abs(difference / standard_error))
+
+
+def _run_stat_test(
+        stat_test: Callable,
+        event_counts_bin_1: np.ndarray,
+        event_counts_bin_2: np.ndarray,
+        obs_counts_bin_1: np.ndarray,
+        obs_counts_bin_2: np.ndarray
+) -> np.ndarray:
+    """
+    Runs a statistical test for many pairs of bins. The default z-test takes all the pairs at once; any other
+    test is called with a single pair of bins at a time, and returns a single p-value.
+
+    :param stat_test: the statistical test, see :meth:`DecisionTreeBinner.fit`
+    :param event_counts_bin_1: the total number of events (e.g. bads) in the first bins of the pairs
+    :param event_counts_bin_2: the total number of events (e.g. bads) in the second bins of the pairs
+    :param obs_counts_bin_1: the total number of observations in the first bins of the pairs
+    :param obs_counts_bin_2: the total number of observations in the second bins of the pairs
+    :return: an array holding the p-value of the test for every pair
     """
 
-    _, p_value = proportion.proportions_ztest(
-        np.array([event_count_bin_1, event_count_bin_2]),
-        np.array([obs_count_bin_1, obs_count_bin_2])
-    )
-    return p_value
+    if stat_test is _proportion_z_test_returning_p_value:
+        return stat_test(event_counts_bin_1, event_counts_bin_2, obs_counts_bin_1, obs_counts_bin_2)
+
+    pairs = zip(event_counts_bin_1, event_counts_bin_2, obs_counts_bin_1, obs_counts_bin_2)
+
+    return np.array([stat_test(*pair) for pair in pairs], dtype=np.float64)
+
+
+def _get_quantile_edges(values: np.ndarray, max_bins: int) -> np.ndarray:
+    """
+    Computes the edges of (at most) `max_bins` equal-frequency bins over the values.
+
+    :param values: the numeric values to be quantised
+    :param max_bins: the maximum number of bins
+    :return: a sorted array of unique edges, starting at the minimum and ending at the maximum value
+    """
+
+    return np.unique(np.quantile(values, np.linspace(0, 1, max_bins + 1)))
 
 
 def _iteratively_merge_bins(
@@ -54,7 +111,13 @@ def _iteratively_merge_bins(
         p_value_threshold: float = P_VALUE_THRESHOLD
 ) -> BinningSpec:
     """
-    TODO fix the method
+    Greedily merges bins whose event (e.g. bad) rates aren't stat. sign. different. The bins are ordered
+    by their event rate, and every pair of neighbours in that order is tested; the pair with the highest
+    p-value is merged first, and the merged bin is then tested against its new neighbours. Merging stops
+    once no pair of neighbours has a p-value at or above the threshold.
+
+    A merged bin spans both numeric parts, from the smaller start to the larger end, so bins that aren't
+    numerically adjacent yield overlapping bins; that's why the binners don't merge numeric bins yet.
 
     :param x: the variable being binned
     :param y: the target variable used to determine which bins to merge
@@ -64,80 +127,122 @@ def _iteratively_merge_bins(
     :return: a binning specification with similar contiguous bins merged
     """
 
-    bins_merged_at_iteration = True
-    new_binning = binning_spec.bins
-
-    while bins_merged_at_iteration:
-        old_binning = new_binning
-        new_binning = set()
-        bins_ordered = list(old_binning)
-        bin_masks = [get_mask_from_range(x, bin) for bin in bins_ordered]
-        bin_event_counts = [y[mask].sum() for mask in bin_masks]
-        bin_sizes = [mask.sum() for mask in bin_masks]
-        bad_rates = [events / size for events, size in zip(bin_event_counts, bin_sizes)]
-
-        # Sort bins according to bad rates.
-        sorted_indexes = np.argsort(bad_rates)
-        i = 1
-
-        # Merge contiguous bins that have bad rates that aren't stat. sign. different.
-        while i < len(sorted_indexes):
-            prev_idx = sorted_indexes[i - 1]
-            idx = sorted_indexes[i]
-            p_value = stat_test(
-                bin_event_counts[prev_idx],
-                bin_event_counts[idx],
-                bin_sizes[prev_idx],
-                bin_sizes[idx]
+    # There's nothing to merge, so the data doesn't even have to be scanned.
+    if len(binning_spec.bins) <= 1:
+        return binning_spec
+
+    # The data is only scanned once: the counts of a merged bin are the sums of the counts of its parts.
+    # The merged bins are tracked in place as arrays of their counts and numeric bounds (NaN if there are
+    # none) and a list of their categorical indicators; the ranges are only built once merging is done.
+    binning = compile_binning(binning_spec.bins)
+    bin_indices = get_bin_indices(prepare_series(x), binning)
+    is_assigned = bin_indices >= 0
+    bin_event_counts = np.bincount(
+        bin_indices[is_assigned],
+        weights=np.asarray(y, dtype=np.float64)[is_assigned],
+        minlength=len(binning.bins)
+    )
+    bin_sizes = np.bincount(bin_indices[is_assigned], minlength=len(binning.bins))
+    bin_starts = np.array(
+        [np.nan if bin.numeric_range_start is None else bin.numeric_range_start for bin in binning.bins]
+    )
+    bin_ends = np.array(
+        [np.nan if bin.numeric_range_end is None else bin.numeric_range_end for bin in binning.bins]
+    )
+    bin_chars = [bin.categorical_indicators for bin in binning.bins]
+
+    # The bins are sorted by bad rate once and kept in a doubly linked list in that order; merging two
+    # neighbours gives a bin whose bad rate lies between theirs, so the order never has to be recomputed.
+    sorted_indexes = np.argsort(bin_event_counts / bin_sizes)
+    previous_of = np.full(len(binning.bins), -1, dtype=np.intp)
+    next_of = np.full(len(binning.bins), -1, dtype=np.intp)
+    previous_of[sorted_indexes[1:]] = sorted_indexes[:-1]
+    next_of[sorted_indexes[:-1]] = sorted_indexes[1:]
+    versions = np.zeros(len(binning.bins), dtype=np.intp)
+    is_alive = np.ones(len(binning.bins), dtype=bool)
+
+    # A max-heap of the p-values of neighbouring pairs, along with the versions of the bins they were
+    # computed for; a pair is stale once either of its bins has been merged since.
+    heap: List[Tuple[float, int, int, int, int]] = []
+
+    def push_pairs(left_indexes: np.ndarray, right_indexes: np.ndarray) -> None:
+        p_values = _run_stat_test(
+            stat_test,
+            bin_event_counts[left_indexes],
+            bin_event_counts[right_indexes],
+            bin_sizes[left_indexes],
+            bin_sizes[right_indexes]
+        )
+
+        for p_value, left, right in zip(p_values, left_indexes, right_indexes):
+
+            if not np.isnan(p_value):
+                heapq.heappush(heap, (-p_value, left, right, versions[left], versions[right]))
+
+    push_pairs(sorted_indexes[:-1], sorted_indexes[1:])
+
+    # Merge the most similar neighbouring bins first, as long as their bad rates aren't stat. sign. different.
+    while len(heap) > 0:
+        negative_p_value, left, right, left_version, right_version = heapq.heappop(heap)
+
+        if not (is_alive[left] and is_alive[right]) or \
+                versions[left] != left_version or versions[right] != right_version:
+            continue
+
+        if -negative_p_value < p_value_threshold:
+            break
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'merging bins (%s, %s) - (%s, %s)',
+                bin_starts[left],
+                bin_ends[left],
+                bin_starts[right],
+                bin_ends[right]
             )
 
-            if p_value >= p_value_threshold:
-                print(
-                    'merging bins ({}, {}) - ({}, {})'.format(
-                        bins_ordered[prev_idx].numeric_range_start,
-                        bins_ordered[prev_idx].numeric_range_end,
-                        bins_ordered[idx].numeric_range_start,
-                        bins_ordered[idx].numeric_range_end
-                    )
-                )
-                new_binning.add(
-                    Range(
-                        numeric_range_start=min(
-                            bins_ordered[prev_idx].numeric_range_start,
-                            bins_ordered[idx].numeric_range_start
-                        ),
-                        numeric_range_end=max(
-                            bins_ordered[prev_idx].numeric_range_end,
-                            bins_ordered[idx].numeric_range_end
-                        ),
-                        categorical_indicators=frozenset.union(
-                            bins_ordered[prev_idx].categorical_indicators,
-                            bins_ordered[idx].categorical_indicators
-                        )
-                    )
-                )
-                i += 2
-
-                # If we have skipped past the last bin, add it.
-                if i == len(sorted_indexes):
-                    new_binning.add(bins_ordered[sorted_indexes[-1]])
-
-            else:
-                new_binning.add(bins_ordered[prev_idx])
-                i += 1
-
-        if len(old_binning) == len(new_binning):
-            bins_merged_at_iteration = False
+        bin_event_counts[left] += bin_event_counts[right]
+        bin_sizes[left] += bin_sizes[right]
+        bin_starts[left] = np.fmin(bin_starts[left], bin_starts[right])
+        bin_ends[left] = np.fmax(bin_ends[left], bin_ends[right])
+        bin_chars[left] = bin_chars[left] | bin_chars[right]
+        versions[left] += 1
+        is_alive[right] = False
+        next_of[left] = next_of[right]
+
+        if next_of[left] >= 0:
+            previous_of[next_of[left]] = left
+
+        neighbours = [
+            (neighbour_left, neighbour_right) for neighbour_left, neighbour_right in (
+                (previous_of[left], left),
+                (left, next_of[left])
+            )
+            if neighbour_left >= 0 and neighbour_right >= 0
+        ]
 
-        elif len(old_binning) > len(new_binning):
-            bins_merged_at_iteration = True
+        if len(neighbours) > 0:
+            push_pairs(
+                np.array([pair[0] for pair in neighbours], dtype=np.intp),
+                np.array([pair[1] for pair in neighbours], dtype=np.intp)
+            )
 
-        else:
-            raise RuntimeError()
+    alive_indexes = np.flatnonzero(is_alive)
+    bin_starts = bin_starts[alive_indexes]
+    bin_ends = bin_ends[alive_indexes]
+    bin_chars = [bin_chars[i] for i in alive_indexes]
 
     return BinningSpec(
         feature=binning_spec.feature,
-        bins=new_binning
+        bins=[
+            Range(
+                numeric_range_start=None if np.isnan(start) else start,
+                numeric_range_end=None if np.isnan(end) else end,
+                categorical_indicators=chars
+            )
+
+            for start, end, chars in zip(bin_starts, bin_ends, bin_chars)
+        ]
     )
 
 
@@ -191,6 +296,62 @@ class PreSpecifiedSpecBinner(AbstractBinner):
         pass
 
 
+class QuantileBinner(AbstractBinner):
+    """
+    A binner that doesn't fit a tree at all, but splits the numeric part of each feature into at most
+    `max_bins` equal-frequency bins. Each categorical indicator is put in a bin of its own.
+    """
+
+    def __init__(
+            self,
+            feature_validator: FeatureValidator,
+            max_bins: int = DEFAULT_QUANTILE_BINNER_MAX_BINS
+    ):
+        """
+        :param feature_validator: a fitted instance of a feature validator
+        :param max_bins: the maximum number of equal-frequency bins the numeric part of a feature is split into
+        """
+
+        if max_bins < 1:
+            raise ValueError(f"The maximum number of bins has to be positive, got {max_bins}.")
+
+        self._feature_validator = feature_validator
+        self._max_bins = max_bins
+        self._spec: Optional[Dict[str, BinningSpec]] = None
+
+    def fit(self, X: pd.DataFrame, y: pd.Series) -> None:
+        """
+        :param X: the DataFrame where the columns are the variables to be binned
+        :param y: the target, not used by this binner
+        """
+
+        spec: Dict[str, BinningSpec] = {}
+
+        for name in X.columns:
+            numeric = pd.to_numeric(X[name], errors='coerce').to_numpy()
+            numeric = numeric[~np.isnan(numeric)]
+            feature = self._feature_validator.feature_spec[name]
+
+            # A purely categorical column has no numeric part to be quantised.
+            if len(numeric) == 0:
+                spec[name] = BinningSpec(
+                    feature=feature,
+                    bins=[Range(categorical_indicators={char}) for char in feature.range.categorical_indicators]
+                )
+                continue
+
+            edges = _get_quantile_edges(numeric, self._max_bins)
+
+            # The outer edges are the minimum and the maximum, which the feature range already covers.
+            spec[name] = retrieve_initial_bins_from_thresholds(
+                feature,
+                edges[1:-1],
+                feature.range.categorical_indicators
+            )
+
+        self._spec = spec
+
+
 class DecisionTreeBinner(AbstractBinner):
     """
     A binner that uses a decision tree classifier to determine bins.
@@ -199,8 +360,9 @@ class DecisionTreeBinner(AbstractBinner):
     def __init__(
             self,
             feature_validator: FeatureValidator,
-            init_kwargs: Dict = DEFAULT_DECISION_TREE_CLASSIFIER_INIT_KWARGS,
-            fit_kwargs: Dict = DEFAULT_DECISION_TREE_CLASSIFIER_FIT_KWARGS
+            init_kwargs: Mapping = DEFAULT_DECISION_TREE_CLASSIFIER_INIT_KWARGS,
+            fit_kwargs: Mapping = DEFAULT_DECISION_TREE_CLASSIFIER_FIT_KWARGS,
+            n_jobs: Optional[int] = -1
     ):
         """
         :param feature_validator: a fitted instance of a feature validator
@@ -208,15 +370,52 @@ class DecisionTreeBinner(AbstractBinner):
                             at instantiation
         :param fit_kwargs:  the keyword argument dictionary that will be passed to the decision tree class
                             when `tree.fit(...)` is called
+        :param n_jobs: the number of threads the features are binned on, `-1` uses all cores, `None` or `1`
+                       bins them sequentially
         """
 
+        # Copies, so that changes to the caller's dictionaries don't affect the binner.
         self._feature_validator = feature_validator
-        self._init_kwargs = init_kwargs
-        self._fit_kwargs = fit_kwargs
+        self._init_kwargs = dict(init_kwargs)
+        self._fit_kwargs = dict(fit_kwargs)
+        self._n_jobs = n_jobs
         self._trees = {}
         self._initial_specs = {}
         self._spec = None
 
+    def _fit_feature(
+            self,
+            name: str,
+            column: pd.Series,
+            y_values: np.ndarray
+    ) -> Tuple[DecisionTreeClassifier, BinningSpec]:
+        """
+        Fits a decision tree on the numeric part of a single column and derives the initial bins from it.
+
+        :param name: the name of the feature
+        :param column: the raw values of the feature
+        :param y_values: the target values aligned with the column
+        :return: the fitted tree and the initial binning spec of the feature
+        """
+
+        numeric = pd.to_numeric(column, errors='coerce').to_numpy()
+        is_numeric = ~np.isnan(numeric)
+        tree = DecisionTreeClassifier(**self._init_kwargs)
+
+        # `sklearn` trees work on contiguous `float32` data, so converting here saves it a copy.
+        tree.fit(
+            np.ascontiguousarray(numeric[is_numeric].reshape(-1, 1), dtype=np.float32),
+            y_values[is_numeric],
+            **self._fit_kwargs
+        )
+        feature = self._feature_validator.feature_spec[name]
+
+        return tree, retrieve_initial_bins_from_tree(
+            feature,
+            tree,
+            feature.range.categorical_indicators
+        )
+
     def fit(
             self,
             X: pd.DataFrame,
@@ -236,19 +435,17 @@ class DecisionTreeBinner(AbstractBinner):
                                   whether two bins have the same event (e.g. bad) rate
         """
 
-        # TODO This piece of code should be parallelised
-        for name in X.columns:
-            numeric = pd.to_numeric(X[name], errors='coerce')
-            self._trees[name] = DecisionTreeClassifier(**self._init_kwargs)
-            self._trees[name].fit(
-                np.expand_dims(numeric[numeric.notnull()], 1),
-                y[numeric.notnull()]
-            )
-            self._initial_specs[name] = retrieve_initial_bins_from_tree(
-                self._feature_validator.feature_spec[name],
-                self._trees[name],
-                self._feature_validator.feature_spec[name].range.categorical_indicators
-            )
+        y_values = np.asarray(y)
+
+        # Trees are fitted independently per column; `sklearn` releases the GIL while fitting them,
+        # so threads are enough to fit them in parallel.
+        results = Parallel(n_jobs=self._n_jobs, prefer='threads')(
+            delayed(self._fit_feature)(name, X[name], y_values) for name in X.columns
+        )
+
+        for name, (tree, initial_spec) in zip(X.columns, results):
+            self._trees[name] = tree
+            self._initial_specs[name] = initial_spec
 
         # Finally, we go through bins, including the categorical ones, and merge the ones that are not
         # stat. sign. different from neighbouring ones.
@@ -265,3 +462,84 @@ class DecisionTreeBinner(AbstractBinner):
 
             for name in self._feature_validator.feature_spec.keys()
         }"""
+
+
+class HistogramBinner(DecisionTreeBinner):
+    """
+    A binner that first quantises each feature into at most `max_bins` equal-frequency bins, as
+    histogram-based gradient boosting does, and then fits the decision tree on the bin codes instead of the
+    raw values. The tree then only has a few hundred candidate splits per feature, which makes it much
+    cheaper to fit on large datasets. The split thresholds are mapped back to the quantile edges.
+    """
+
+    def __init__(
+            self,
+            feature_validator: FeatureValidator,
+            init_kwargs: Mapping = DEFAULT_DECISION_TREE_CLASSIFIER_INIT_KWARGS,
+            fit_kwargs: Mapping = DEFAULT_DECISION_TREE_CLASSIFIER_FIT_KWARGS,
+            max_bins: int = DEFAULT_HISTOGRAM_BINNER_MAX_BINS,
+            n_jobs: Optional[int] = -1
+    ):
+        """
+        :param feature_validator: a fitted instance of a feature validator
+        :param init_kwargs: the keyword argument dictionary that will be passed to the decision tree class
+                            at instantiation
+        :param fit_kwargs:  the keyword argument dictionary that will be passed to the decision tree class
+                            when `tree.fit(...)` is called
+        :param max_bins: the maximum number of quantile bins a feature is quantised into, at most 256
+        :param n_jobs: the number of threads the features are binned on, `-1` uses all cores, `None` or `1`
+                       bins them sequentially
+        """
+
+        if not 2 <= max_bins <= 256:
+            raise ValueError(f"The maximum number of bins has to be between 2 and 256, got {max_bins}.")
+
+        super().__init__(
+            feature_validator=feature_validator,
+            init_kwargs=init_kwargs,
+            fit_kwargs=fit_kwargs,
+            n_jobs=n_jobs
+        )
+        self._max_bins = max_bins
+
+    def _fit_feature(
+            self,
+            name: str,
+            column: pd.Series,
+            y_values: np.ndarray
+    ) -> Tuple[DecisionTreeClassifier, BinningSpec]:
+        """
+        Quantises the numeric part of a single column, fits a decision tree on the bin codes and derives
+        the initial bins from it.
+
+        :param name: the name of the feature
+        :param column: the raw values of the feature
+        :param y_values: the target values aligned with the column
+        :return: the fitted tree and the initial binning spec of the feature
+        """
+
+        numeric = pd.to_numeric(column, errors='coerce').to_numpy()
+        is_numeric = ~np.isnan(numeric)
+        values = numeric[is_numeric]
+        edges = _get_quantile_edges(values, self._max_bins)
+
+        # The codes are right-closed like the bins are: code `k` holds the values in
+        # `(edges[k], edges[k + 1]]`, and code 0 holds the minimum as well.
+        codes = np.searchsorted(edges[1:-1], values, side='left')
+        tree = DecisionTreeClassifier(**self._init_kwargs)
+        tree.fit(
+            codes.astype(np.float32).reshape(-1, 1),
+            y_values[is_numeric],
+            **self._fit_kwargs
+        )
+
+        # A threshold of `k + 0.5` separates codes up to `k` from the rest, i.e. it's the upper edge of code `k`.
+        code_thresholds = retrieve_thresholds_from_tree(tree)
+        thresholds = edges[np.floor(code_thresholds).astype(int) + 1]
+        feature = self._feature_validator.feature_spec[name]
+
+        return tree, retrieve_initial_bins_from_thresholds(
+            feature,
+            thresholds,
+            feature.range.categorical_indicators
+        )
@@ -4,8 +4,9 @@ Utility methods used throughout feature engineering/preprocessing classes.
 """
 
 import pandas as pd
+import numpy as np
 
-from typing import List, FrozenSet
+from typing import FrozenSet, Iterable, Mapping, NamedTuple, Sequence, Tuple, cast
 from sklearn.tree import DecisionTreeClassifier
 from pywoe.data_models.base import Range
 from pywoe.data_models.feature import Feature
@@ -34,6 +35,82 @@ def retrieve_feature_definition(ser: pd.Series) -> Feature:
     )
 
 
+class PreparedSeries(NamedTuple):
+    """
+    A `pandas` Series converted once into the `numpy` arrays needed to match its values against bins,
+    so that the conversion isn't repeated for every bin.
+    """
+
+    numeric: np.ndarray
+    """
+    The values converted to floats; the values that aren't numeric are NaN.
+    """
+
+    is_numeric: np.ndarray
+    """
+    A boolean mask of the numeric values.
+    """
+
+    char_codes: np.ndarray
+    """
+    An integer code for each value that isn't numeric, in the order they appear in; the code is the position of
+    the value in `char_values`.
+    """
+
+    char_values: np.ndarray
+    """
+    The distinct values that aren't numeric, as strings.
+    """
+
+
+def prepare_series(ser: pd.Series) -> PreparedSeries:
+    """
+    Converts a `pandas` Series into the arrays used to match its values against bins.
+
+    :param ser: the `pandas` Series to be converted
+    :return: the converted Series
+    """
+
+    numeric = pd.to_numeric(ser, errors='coerce').to_numpy(dtype=np.float64)
+    is_numeric = ~np.isnan(numeric)
+
+    # Matching chars against bins then works on the few distinct values, and the codes just pick the result.
+    char_codes, char_values = pd.factorize(ser.to_numpy()[~is_numeric].astype(str))
+
+    return PreparedSeries(
+        numeric=numeric,
+        is_numeric=is_numeric,
+        char_codes=char_codes,
+        char_values=np.asarray(char_values)
+    )
+
+
+def get_mask_from_prepared(prepared: PreparedSeries, bin: Range) -> np.ndarray:
+    """
+    Transforms a range object to a mask on a prepared `pandas` Series.
+
+    :param prepared: the prepared `pandas` Series to be turned into a mask
+    :param bin: the range object that defines the range the mask should pick out
+    :return: a boolean mask picking out the values that fall in the range
+    """
+
+    if bin.numeric_range_start is not None:
+
+        # The values that aren't numeric are NaN and simply compare as false.
+        with np.errstate(invalid='ignore'):
+            mask = (prepared.numeric > bin.numeric_range_start) & (prepared.numeric <= bin.numeric_range_end)
+
+    else:
+        mask = np.zeros(len(prepared.numeric), dtype=bool)
+
+    # The chars are matched on their distinct values, and the codes pick the result.
+    if len(bin.categorical_indicators) > 0 and len(prepared.char_codes) > 0:
+        is_char_in_bin = np.isin(prepared.char_values, list(bin.categorical_indicators))
+        mask[~prepared.is_numeric] = is_char_in_bin[prepared.char_codes]
+
+    return mask
+
+
 def get_mask_from_range(ser: pd.Series, bin: Range) -> pd.Series:
     """
     Transforms a range object to a mask on a `pandas` Series.
@@ -44,16 +121,152 @@ def get_mask_from_range(ser: pd.Series, bin: Range) -> pd.Series:
              the range
     """
 
-    if bin.numeric_range_start is not None:
-        return (
-                (pd.to_numeric(ser, errors='coerce') > bin.numeric_range_start) & \
-                (pd.to_numeric(ser, errors='coerce') <= bin.numeric_range_end)
-            ) | (
-                ser.isin(bin.categorical_indicators)
-            )
+    return pd.Series(
+        get_mask_from_prepared(prepare_series(ser), bin),
+        index=ser.index
+    )
 
-    else:
-        return ser.isin(bin.categorical_indicators)
+
+class CompiledBinning(NamedTuple):
+    """
+    The bins of a feature laid out as arrays, so that values can be assigned to bins with `numpy` operations
+    instead of going through the `Range` objects one by one.
+    """
+
+    bins: Tuple[Range, ...]
+    """
+    The bins, in the order the bin indices refer to.
+    """
+
+    numeric_positions: np.ndarray
+    """
+    The positions in `bins` of the bins with a numeric part, sorted by their numeric start.
+    """
+
+    numeric_starts: np.ndarray
+    """
+    The numeric starts of the bins in `numeric_positions`, in the same order.
+    """
+
+    numeric_ends: np.ndarray
+    """
+    The numeric ends of the bins in `numeric_positions`, in the same order.
+    """
+
+    bin_of_char: Mapping[str, int]
+    """
+    The position in `bins` of the bin each categorical indicator belongs to.
+    """
+
+
+def compile_binning(bins: Sequence[Range]) -> CompiledBinning:
+    """
+    Lays out the bins of a feature as arrays, see :class:`CompiledBinning`.
+
+    :param bins: the disjoint bins of a feature
+    :return: the compiled bins
+    """
+
+    bins = tuple(bins)
+    numeric_positions = np.array(
+        sorted(
+            [i for i, bin in enumerate(bins) if bin.numeric_range_start is not None],
+            key=lambda i: cast(float, bins[i].numeric_range_start)
+        ),
+        dtype=np.intp
+    )
+
+    return CompiledBinning(
+        bins=bins,
+        numeric_positions=numeric_positions,
+        numeric_starts=np.array([bins[i].numeric_range_start for i in numeric_positions], dtype=np.float64),
+        numeric_ends=np.array([bins[i].numeric_range_end for i in numeric_positions], dtype=np.float64),
+        bin_of_char={
+            char: i for i, bin in enumerate(bins) for char in bin.categorical_indicators
+        }
+    )
+
+
+def get_bin_indices(prepared: PreparedSeries, binning: CompiledBinning) -> np.ndarray:
+    """
+    Assigns every value of a prepared `pandas` Series to a bin in a single pass, instead of building a mask
+    per bin. Numeric values are located with a binary search over the numeric bin ends, char values are
+    looked up through their codes.
+
+    :param prepared: the prepared `pandas` Series to be assigned to bins
+    :param binning: the compiled disjoint bins the values are assigned to
+    :return: an integer array holding, for every value, the position of its bin in `binning.bins`, or -1 if
+             the value falls in none of them
+    """
+
+    is_numeric = prepared.is_numeric
+    bin_indices = np.empty(len(is_numeric), dtype=np.intp)
+
+    # The bins are disjoint, so the first bin ending at or after a value is the only one that can hold it.
+    # A value past the last end picks the trailing -1, and the infinite start rejects it.
+    values = prepared.numeric[is_numeric]
+    candidates = np.searchsorted(binning.numeric_ends, values, side='left')
+    bin_of_candidate = np.append(binning.numeric_positions, -1)
+    bin_of_candidate = bin_of_candidate[candidates]
+    bin_of_candidate[values <= np.append(binning.numeric_starts, np.inf)[candidates]] = -1
+    bin_indices[is_numeric] = bin_of_candidate
+
+    # Each distinct char value is looked up once, and the codes pick the result.
+    bin_of_code = np.array(
+        [binning.bin_of_char.get(char, -1) for char in prepared.char_values],
+        dtype=np.intp
+    )
+    bin_indices[~is_numeric] = bin_of_code[prepared.char_codes]
+
+    return bin_indices
+
+
+def retrieve_thresholds_from_tree(tree: DecisionTreeClassifier) -> np.ndarray:
+    """
+    Retrieves the split thresholds of a fitted decision tree that serve as bin edges, i.e. the thresholds
+    of the nodes that have at least one leaf as a child.
+
+    :param tree: a fitted `sklearn` decision tree classifier
+    :return: an array of thresholds, in no particular order
+    """
+
+    children_left = tree.tree_.children_left
+    children_right = tree.tree_.children_right
+
+    # A node is a leaf if both of its children are undefined (-1). The children of leaves index the last
+    # node, but leaves are excluded anyway.
+    is_leaf = children_left == children_right
+    is_parent_of_leaf = ~is_leaf & (is_leaf[children_left] | is_leaf[children_right])
+
+    return tree.tree_.threshold[is_parent_of_leaf]
+
+
+def retrieve_initial_bins_from_thresholds(
+        feature: Feature,
+        thresholds: Iterable[float],
+        categorical_indicators: FrozenSet
+) -> BinningSpec:
+    """
+    Converts a set of numeric thresholds to an initial binning spec further refined in binning process.
+    Each categorical indicator is put in a bin of its own. The thresholds have to lie within the
+    feature range.
+
+    :param feature: the feature that's being binned
+    :param thresholds: the numeric thresholds between the bins, in any order
+    :param categorical_indicators: the categorical indicator set to be used
+    :return: a :class:`BinningSpec` object specifying binning for a feature
+    """
+
+    sorted_thresholds = np.unique(np.concatenate((
+        [feature.range.numeric_range_start, feature.range.numeric_range_end],
+        np.asarray(thresholds, dtype=np.float64)
+    )))
+
+    return _get_spec(
+        feature,
+        sorted_thresholds,
+        categorical_indicators
+    )
 
 
 def retrieve_initial_bins_from_tree(
@@ -72,33 +285,16 @@ def retrieve_initial_bins_from_tree(
     :return: a :class:`BinningSpec` object specifying binning for a feature
     """
 
-    stack = [0]
-    bin_thresholds = [feature.range.numeric_range_start, feature.range.numeric_range_end]
-
-    while len(stack) > 0:
-        node_id = stack.pop()
-
-        if not _is_leaf(tree, node_id):
-            left_child = tree.tree_.children_left[node_id]
-            right_child = tree.tree_.children_right[node_id]
-            stack.append(right_child)
-            stack.append(left_child)
-
-            if _is_leaf(tree, left_child) or _is_leaf(tree, right_child):
-                bin_thresholds.append(tree.tree_.threshold[node_id])
-
-    sorted_thresholds = sorted(list(set(bin_thresholds)))
-
-    return _get_spec(
+    return retrieve_initial_bins_from_thresholds(
         feature,
-        sorted_thresholds,
+        retrieve_thresholds_from_tree(tree),
         categorical_indicators
     )
 
 
 def _get_spec(
         feature: Feature,
-        sorted_thresholds: List,
+        sorted_thresholds: np.ndarray,
         categorical_indicators: FrozenSet
 ) -> BinningSpec:
     """
@@ -110,38 +306,24 @@ def _get_spec(
     :return:
     """
 
-    list_of_sets_required = [
-        set([
-            Range(
-                numeric_range_start=sorted_thresholds[i],
-                numeric_range_end=threshold
-            )
-        ])
+    # The thresholds lie within the (already validated) feature range, so the ranges can be built
+    # without re-running the validation for each of them.
+    bins = [
+        Range._unchecked(
+            numeric_range_start=float(start),
+            numeric_range_end=float(end)
+        )
 
-        for i, threshold in enumerate(sorted_thresholds[1:])
+        for start, end in zip(sorted_thresholds[:-1], sorted_thresholds[1:])
     ] + [
-        set([
-            Range(
-                categorical_indicators=set([char])
-            )
-        ])
+        Range._unchecked(
+            categorical_indicators=frozenset((char,))
+        )
 
         for char in categorical_indicators
     ]
 
     return BinningSpec(
         feature=feature,
-        bins=set.union(*list_of_sets_required)
+        bins=bins
     )
-
-
-def _is_leaf(tree: DecisionTreeClassifier, node_id: int) -> bool:
-    """
-    Determines if a tree node is a leaf.
-
-    :param tree: an `sklearn` decision tree classifier object
-    :param node_id: an integer identifying a node in the above tree
-    :return: a boolean `True` if the node is a leaf, `False` otherwise
-    """
-
-    return tree.tree_.children_left[node_id] == tree.tree_.children_right[node_id]
@@ -10,7 +10,7 @@ import pandas as pd
 from typing import Dict
 from sklearn.base import BaseEstimator, TransformerMixin
 from pywoe.data_models.feature import Feature
-from pywoe.feature_engineering.utils import retrieve_feature_definition
+from pywoe.feature_engineering.utils import retrieve_feature_definition, prepare_series
 from pywoe.constants import NUMERIC_ACCURACY
 
 
@@ -63,37 +63,43 @@ class FeatureValidator(BaseEstimator, TransformerMixin):
         :param X: the inference-bound data to be used
         """
 
-        # A copy to work on when transforming types
-        X_copy = X[list(self.feature_spec.keys())].copy(deep=True)
-
         if self.feature_spec is None:
             raise ValueError("Please fit the transformer before applying it!")
 
+        errors = []
+        validated = {}
+
+        # Every column is converted once, and the output column is assembled from the converted values:
+        # numbers as floats, anything else as strings.
         for name, feat in self.feature_spec.items():
-            numeric = pd.to_numeric(X[name], errors='coerce')
-            char_values = frozenset(X[name][numeric.isnull()].values)
-            set_difference = char_values - feat.range.categorical_indicators
-
-            if feat.range.numeric_range_start - numeric.min() > NUMERIC_ACCURACY:
-                raise ValueError("The feature `{name}` is outside its range (min={min})".format(
-                    name=name,
-                    min=feat.range.numeric_range_start
-                ))
-
-            elif numeric.max() - feat.range.numeric_range_end > NUMERIC_ACCURACY:
-                raise ValueError("The feature `{name}` is outside its range (max={max})".format(
-                    name=name,
-                    min=feat.range.numeric_range_end
-                ))
-
-            elif len(set_difference) > 0:
-                raise ValueError("The feature `{name}` has unrecognised char values: {vals}".format(
-                    name=name,
-                    vals=list(set_difference)
-                ))
+            prepared = prepare_series(X[name])
+            values = prepared.numeric[prepared.is_numeric]
+            set_difference = frozenset(prepared.char_values) - feat.range.categorical_indicators
+
+            if len(values) > 0 and feat.range.numeric_range_start - values.min() > NUMERIC_ACCURACY:
+                errors.append(
+                    f"The feature `{name}` is outside its range (min={feat.range.numeric_range_start})"
+                )
+
+            if len(values) > 0 and values.max() - feat.range.numeric_range_end > NUMERIC_ACCURACY:
+                errors.append(
+                    f"The feature `{name}` is outside its range (max={feat.range.numeric_range_end})"
+                )
+
+            if len(set_difference) > 0:
+                errors.append(
+                    f"The feature `{name}` has unrecognised char values: {list(set_difference)}"
+                )
+
+            if len(prepared.char_codes) > 0:
+                column = prepared.numeric.astype(object)
+                column[~prepared.is_numeric] = prepared.char_values[prepared.char_codes]
+                validated[name] = column
 
             else:
-                X_copy.loc[numeric.notnull(), name] = numeric[numeric.notnull()]
-                X_copy.loc[numeric.isnull(), name] = X_copy.loc[numeric.isnull(), name].astype(str)
+                validated[name] = prepared.numeric
+
+        if len(errors) > 0:
+            raise ValueError("\n".join(errors))
 
-        return X_copy
+        return pd.DataFrame(validated, index=X.index, columns=list(self.feature_spec.keys()))
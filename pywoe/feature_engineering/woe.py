@@ -3,59 +3,74 @@
 Weigt-of-Evidence `sklearn` transformer class for use in `sklearn` pipelines.
 """
 
+import logging
 import pandas as pd
 import numpy as np
 
-from typing import Dict, AnyStr, Type
+from typing import Dict, AnyStr, Optional, Tuple, Type
+from joblib import Parallel, delayed
 from sklearn.base import BaseEstimator, TransformerMixin
+from pywoe.data_models.binning import BinningSpec
 from pywoe.data_models.woe import WoESpec, WoEBin
 from pywoe.feature_engineering.binning import AbstractBinner
 from pywoe.constants import NUMERIC_ACCURACY
-from pywoe.feature_engineering.utils import get_mask_from_range
+from pywoe.feature_engineering.utils import \
+    CompiledBinning, \
+    compile_binning, \
+    get_bin_indices, \
+    prepare_series
 
+logger = logging.getLogger(__name__)
 
-def _compute_woe(
+
+def _compute_woe_and_iv(
         all_event_count: int,
         all_non_event_count: int,
-        bin_event_count: int,
-        bin_non_event_count: int
-) -> float:
+        bin_event_count: np.ndarray,
+        bin_non_event_count: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    A method that computes the Weight-of-Evidence value for a bin.
+    A method that computes the Weight-of-Evidence values and the Information Values for all bins of a
+    feature at once. Both share the event and non-event percentages and the log ratio, so they're only
+    computed once.
 
     :param all_event_count: the number of events (e.g. total number of bads)
     :param all_non_event_count: the number of non-events (e.g. total number of goods)
-    :param bin_event_count: the number of events in the bin (e.g. bads in the bin)
-    :param bin_non_event_count: the number of non-events in the bin (e.g. goods in the bin)
-    :return: the Weight-of-Evidence value
+    :param bin_event_count: the number of events in each bin (e.g. bads in the bin)
+    :param bin_non_event_count: the number of non-events in each bin (e.g. goods in the bin)
+    :return: the Weight-of-Evidence value and the Information Value of each bin
     """
 
-    bin_event_prcnt = bin_event_count / (all_event_count + NUMERIC_ACCURACY)
-    bin_non_event_prcnt = bin_non_event_count / (all_non_event_count + NUMERIC_ACCURACY)
-    return np.log(bin_event_prcnt / (bin_non_event_prcnt + NUMERIC_ACCURACY))
+    # The counts are converted once, so that the arithmetic below runs on float arrays and float scalars only.
+    bin_events = np.asarray(bin_event_count, dtype=np.float64)
+    bin_non_events = np.asarray(bin_non_event_count, dtype=np.float64)
+    all_events = float(all_event_count)
+    all_non_events = float(all_non_event_count)
 
+    bin_event_prcnt = bin_events / (all_events + NUMERIC_ACCURACY)
+    bin_non_event_prcnt = bin_non_events / (all_non_events + NUMERIC_ACCURACY)
+    woe = np.log(bin_event_prcnt / (bin_non_event_prcnt + NUMERIC_ACCURACY))
 
-def _compute_iv(
-        all_event_count: int,
-        all_non_event_count: int,
-        bin_event_count: int,
-        bin_non_event_count: int
-):
-    """
-    A method that computes the Information Value for a bin.
+    return woe, (bin_event_prcnt - bin_non_event_prcnt) * woe
 
-    :param all_event_count: the number of events (e.g. total number of bads)
-    :param all_non_event_count: the number of non-events (e.g. total number of goods)
-    :param bin_event_count: the number of events in the bin (e.g. bads in the bin)
-    :param bin_non_event_count: the number of non-events in the bin (e.g. goods in the bin)
-    :return: the Information Value
+
+def _compile_woe_spec(
+        spec: WoESpec,
+        dtype: Type[np.floating] = np.float64
+) -> Tuple[CompiledBinning, np.ndarray]:
     """
+    Turns a WoE specification into the arrays needed to transform a column in a single pass.
 
-    bin_event_prcnt = bin_event_count / (all_event_count + NUMERIC_ACCURACY)
-    bin_non_event_prcnt = bin_non_event_count / (all_non_event_count + NUMERIC_ACCURACY)
+    :param spec: the WoE specification of a feature
+    :param dtype: the floating point type the WoE values are stored in
+    :return: the compiled bins and an array holding the WoE value of each bin, followed by a NaN for the
+             values that fall in none of them
+    """
 
-    return (bin_event_prcnt - bin_non_event_prcnt) * \
-        np.log(bin_event_prcnt / (bin_non_event_prcnt + NUMERIC_ACCURACY))
+    return (
+        compile_binning([woe_bin.bin for woe_bin in spec.bins]),
+        np.array([woe_bin.woe for woe_bin in spec.bins] + [np.nan], dtype=dtype)
+    )
 
 
 class WoETransformer(BaseEstimator, TransformerMixin):
@@ -66,15 +81,26 @@ class WoETransformer(BaseEstimator, TransformerMixin):
     def __init__(
             self,
             binner: Type[AbstractBinner] = None,
-            woe_spec: Dict[AnyStr, WoESpec] = None
+            woe_spec: Dict[AnyStr, WoESpec] = None,
+            dtype: Type[np.floating] = np.float64,
+            n_jobs: Optional[int] = -1
     ):
         """
 
         :param woe_spec: in case we want to load a pre-defined WoE specification, we can provide
                          this parameter with a value
         :param binner: the binner that will be used to define bins over which WoE will be computed
+        :param dtype: the floating point type of the transformed columns, e.g. `np.float32` to halve the
+                      memory they take; values are still assigned to bins in double precision
+        :param n_jobs: the number of threads the features are fitted and transformed on, `-1` uses all cores,
+                       `None` or `1` processes them sequentially
         """
 
+        self.dtype = dtype
+        self.n_jobs = n_jobs
+        self._compiled: Dict[str, Tuple[WoESpec, Tuple[CompiledBinning, np.ndarray]]] = {}
+        self._compiled_dtype: Optional[type] = None
+
         if woe_spec is not None:
             self.woe_spec = woe_spec
 
@@ -85,6 +111,73 @@ class WoETransformer(BaseEstimator, TransformerMixin):
         else:
             raise ValueError("Either the WoE specification or the binner has to be provided.")
 
+    def _fit_feature(
+            self,
+            spec: BinningSpec,
+            column: pd.Series,
+            event: np.ndarray,
+            all_event_count: int,
+            all_non_event_count: int
+    ) -> Tuple[WoESpec, Tuple[CompiledBinning, np.ndarray]]:
+        """
+        Computes the WoE specification of a single feature from its bins, along with its compiled form, so
+        that it doesn't have to be compiled again from the specification.
+
+        :param spec: the binning specification of the feature
+        :param column: the raw values of the feature
+        :param event: a boolean array marking the events (e.g. bads), aligned with the column
+        :param all_event_count: the number of events (e.g. total number of bads)
+        :param all_non_event_count: the number of non-events (e.g. total number of goods)
+        :return: the WoE specification of the feature and the compiled bins with their WoE lookup array
+        """
+
+        binning = compile_binning(spec.bins)
+        bin_indices = get_bin_indices(prepare_series(column), binning)
+        is_assigned = bin_indices >= 0
+
+        # Each row is assigned to its bin once, and the counts of all bins are taken in one go. The
+        # counts are taken as integers, rather than as sums of float weights; the non-events in a bin
+        # are whatever isn't an event.
+        bin_event_counts = np.bincount(
+            bin_indices[is_assigned & event],
+            minlength=len(binning.bins)
+        ).astype(np.int64, copy=False)
+        bin_non_event_counts = np.bincount(
+            bin_indices[is_assigned],
+            minlength=len(binning.bins)
+        ).astype(np.int64, copy=False) - bin_event_counts
+
+        # WoE and IV are computed for all the bins of the feature in one go.
+        woes, ivs = _compute_woe_and_iv(
+            all_event_count,
+            all_non_event_count,
+            bin_event_counts,
+            bin_non_event_counts
+        )
+
+        woe_spec = WoESpec(
+            feature=spec.feature,
+            bins=[
+                WoEBin(
+                    bin_event_count=bin_event_count,
+                    bin_non_event_count=bin_non_event_count,
+                    woe=woe,
+                    iv=iv,
+                    bin=bin
+                )
+
+                for bin, bin_event_count, bin_non_event_count, woe, iv in zip(
+                    binning.bins,
+                    bin_event_counts,
+                    bin_non_event_counts,
+                    woes,
+                    ivs
+                )
+            ]
+        )
+
+        return woe_spec, (binning, np.append(woes, np.nan).astype(self.dtype, copy=False))
+
     def fit(self, X: pd.DataFrame, y: pd.Series):
         """
         :param X: the dataset to be WoE-transformed
@@ -94,49 +187,77 @@ class WoETransformer(BaseEstimator, TransformerMixin):
 
         # TODO some checking on `X` and `y` to validate them should be done
         if self.woe_spec is None:
-            self.woe_spec = {}
             self._binner.fit(X, y)
             binning_spec = self._binner.get_binning_spec()
-            event = y.astype(bool)
-            non_event = ~(y.astype(bool))
-
-            for name, spec in binning_spec.items():
-                all_event_count = event.sum()
-                all_non_event_count = non_event.sum()
-                woe_bins = set()
-
-                # Impute with the right WoE value
-                for bin in spec.bins:
-                    bin_mask = get_mask_from_range(X[name], bin)
-                    bin_event_count = event[bin_mask].sum()
-                    bin_non_event_count = non_event[bin_mask].sum()
-                    woe_bins.add(
-                        WoEBin(
-                            bin_event_count=bin_event_count,
-                            bin_non_event_count=bin_non_event_count,
-                            woe=_compute_woe(
-                                all_event_count,
-                                all_non_event_count,
-                                bin_event_count,
-                                bin_non_event_count
-                            ),
-                            iv=_compute_iv(
-                                all_event_count,
-                                all_non_event_count,
-                                bin_event_count,
-                                bin_non_event_count
-                            ),
-                            bin=bin
-                        )
-                    )
-
-                self.woe_spec[name] = WoESpec(
-                    feature=spec.feature,
-                    bins=woe_bins
-                )
+            event = np.asarray(y).astype(bool)
+            all_event_count = event.sum()
+            all_non_event_count = len(event) - all_event_count
+
+            # Features are independent of each other, and the heavy lifting is done by `numpy`, which releases
+            # the GIL, so they're fitted on threads.
+            results = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+                delayed(self._fit_feature)(spec, X[name], event, all_event_count, all_non_event_count)
+                for name, spec in binning_spec.items()
+            )
+            self.woe_spec = {name: woe_spec for name, (woe_spec, _) in zip(binning_spec.keys(), results)}
+            self._compiled = {name: result for name, result in zip(binning_spec.keys(), results)}
+            self._compiled_dtype = self.dtype
 
         return self
 
+    def _get_compiled(self) -> Dict[str, Tuple[CompiledBinning, np.ndarray]]:
+        """
+        Retrieves the compiled bins and WoE lookup arrays of all features. Each feature is compiled from its
+        WoE specification the first time it's needed, and compiled again only if its specification has been
+        replaced since, e.g. by assigning a new one to `woe_spec[name]`. All of them are compiled again if the
+        output type has changed, e.g. through `set_params`.
+
+        :return: the compiled bins and the WoE lookup array of each feature
+        """
+
+        if self._compiled_dtype != self.dtype:
+            self._compiled = {}
+            self._compiled_dtype = self.dtype
+
+        # The specifications are immutable, so a feature whose specification is the very same object as the
+        # one it was compiled from doesn't need compiling again.
+        compiled: Dict[str, Tuple[WoESpec, Tuple[CompiledBinning, np.ndarray]]] = {}
+
+        for name, spec in self.woe_spec.items():
+            cached = self._compiled.get(name)
+
+            if cached is None or cached[0] is not spec:
+                cached = (spec, _compile_woe_spec(spec, self.dtype))
+
+            compiled[name] = cached
+
+        self._compiled = compiled
+
+        return {name: compiled_spec for name, (_, compiled_spec) in compiled.items()}
+
+    @staticmethod
+    def _transform_column(
+            compiled: Tuple[CompiledBinning, np.ndarray],
+            column: pd.Series,
+            out: np.ndarray
+    ) -> None:
+        """
+        Replaces the raw values of a single column with the WoE values of their bins. Each value is assigned
+        to its bin in one pass, and the WoE values are gathered by bin index, with -1, i.e. no bin, picking
+        the trailing NaN.
+
+        :param compiled: the compiled bins of the feature and its WoE lookup array
+        :param column: the raw values of the feature
+        :param out: the array the WoE values of the column are written to
+        """
+
+        binning, woe_lookup = compiled
+        bin_indices = get_bin_indices(prepare_series(column), binning)
+
+        # The indices never go below -1, so wrapping them is the same as indexing with them, and it lets `take`
+        # write into `out` directly instead of through a buffer.
+        woe_lookup.take(bin_indices, out=out, mode='wrap')
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """
         Applies a WoE transformation, replacing raw feature values with corresponding WoE bin values.
@@ -145,18 +266,34 @@ class WoETransformer(BaseEstimator, TransformerMixin):
         :return: a transformed DataFrame with WoE values instead of raw input features
         """
 
-        # A copy to work on when transforming columns
-        X_copy = X[list(self.woe_spec.keys())].copy(deep=True)
-
         if self.woe_spec is None:
             raise ValueError("Please fit the transformer before applying it!")
 
-        for name, spec in self.woe_spec.items():
+        compiled = self._get_compiled()
 
-            # Impute with the right WoE value
-            for woe_bin in spec.bins:
-                X_copy.loc[get_mask_from_range(X[name], woe_bin.bin), name] = woe_bin.woe
+        # The columns are written straight into a single column-major array, which the DataFrame then wraps
+        # without copying. Each column is written by its own thread.
+        names = list(self.woe_spec.keys())
+        transformed = np.empty((len(X), len(names)), dtype=self.dtype, order='F')
+        Parallel(n_jobs=self.n_jobs, prefer='threads')(
+            delayed(self._transform_column)(compiled[name], X[name], transformed[:, j])
+            for j, name in enumerate(names)
+        )
+
+        X_transformed = pd.DataFrame(transformed, index=X.index, columns=names)
+        logger.debug('WoE-transformed %s rows of %s features', len(X_transformed), len(X_transformed.columns))
+
+        return X_transformed
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restores a pickled state; transformers pickled before the compiled bins were cached get an empty cache.
+        The compiled bins are pickled along with the rest of the state, as contiguous `numpy` arrays, so with
+        pickle protocol 5 they can be passed out-of-band and loaded without a copy.
+
+        :param state: the pickled state
+        """
 
-        print(self.woe_spec)
-        print(X_copy)
-        return X_copy
+        super().__setstate__(state)
+        self.__dict__.setdefault('_compiled', {})
+        self.__dict__.setdefault('_compiled_dtype', None)
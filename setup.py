@@ -3,6 +3,7 @@
 Package setup.
 """
 
+import os
 import setuptools
 
 # Load content saved elsewhere needed in the setup.
@@ -15,6 +16,14 @@ with open("pywoe/VERSION", "r") as fh:
 with open("requirements.txt", "r") as fh:
     requirements = fh.readlines()
 
+# The range validation helpers run on every binning/WoE spec construction, so wheels can be built with them
+# compiled by `mypyc`, e.g. `PYWOE_USE_MYPYC=1 python setup.py bdist_wheel`. Source installs stay pure Python.
+ext_modules = []
+
+if os.environ.get("PYWOE_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+    ext_modules = mypycify(["pywoe/data_models/utils.py"])
+
 setuptools.setup(
     name="pywoe",
     version=version,
@@ -26,6 +35,7 @@ setuptools.setup(
     url="https://github.com/pyscoring/pywoe",
     packages=setuptools.find_packages(),
     install_requires=requirements,
+    ext_modules=ext_modules,
     classifiers=[
         "Programming Language :: Python :: 3"
     ],
@@ -4,12 +4,15 @@ A simple test that checks whether a custom pipeline works well on one of the sta
 datasets.
 """
 
+import attr
 import cattr
 import unittest
+import pickle
 import pprint
+import numpy as np
 
 from pywoe.feature_engineering.validator import FeatureValidator
-from pywoe.feature_engineering.binning import DecisionTreeBinner
+from pywoe.feature_engineering.binning import DecisionTreeBinner, HistogramBinner, QuantileBinner
 from pywoe.feature_engineering.woe import WoETransformer
 from sklearn.pipeline import Pipeline
 from sklearn.datasets import load_breast_cancer
@@ -17,17 +20,19 @@ from sklearn.datasets import load_breast_cancer
 
 class CustomPipelineTests(unittest.TestCase):
 
+    tree_init_kwargs = {
+        "criterion": "gini",
+        "max_depth": 3,
+        "min_samples_leaf": 0.2
+    }
+
     @classmethod
     def setUpClass(cls):
         cls.X, cls.y = load_breast_cancer(return_X_y=True, as_frame=True)
         cls.feature_validator = FeatureValidator()
         cls.binner = DecisionTreeBinner(
             feature_validator=cls.feature_validator,
-            init_kwargs={
-                "criterion": "gini",
-                "max_depth": 3,
-                "min_samples_leaf": 0.2
-            }
+            init_kwargs=cls.tree_init_kwargs
         )
         cls.woe_transformer = WoETransformer(binner=cls.binner)
         cls.pipeline = Pipeline([
@@ -39,3 +44,131 @@ class CustomPipelineTests(unittest.TestCase):
         self.pipeline.fit(self.X, self.y)
         print(self.pipeline.transform(self.X))
         print(self.pipeline['woe_transformer'].woe_spec['mean radius'].bins)
+
+    def test_fitting_with_histogram_binner(self):
+        feature_validator = FeatureValidator()
+        binner = HistogramBinner(
+            feature_validator=feature_validator,
+            init_kwargs=self.tree_init_kwargs,
+            max_bins=32
+        )
+        pipeline = Pipeline([
+            ('validator', feature_validator),
+            ('woe_transformer', WoETransformer(binner=binner))
+        ])
+        pipeline.fit(self.X, self.y)
+        transformed = pipeline.transform(self.X)
+
+        self.assertEqual(transformed.shape, self.X.shape)
+        self.assertFalse(transformed.isnull().any().any())
+
+    def test_sequential_and_parallel_binning_agree(self):
+        feature_validator = FeatureValidator().fit(self.X)
+        specs = []
+
+        for n_jobs in (1, -1):
+            binner = DecisionTreeBinner(
+                feature_validator=feature_validator,
+                init_kwargs=self.tree_init_kwargs,
+                n_jobs=n_jobs
+            )
+            binner.fit(self.X, self.y)
+            specs.append(binner.get_binning_spec())
+
+        self.assertEqual(specs[0], specs[1])
+
+    def test_transforming_to_float32(self):
+        feature_validator = FeatureValidator()
+        binner = DecisionTreeBinner(
+            feature_validator=feature_validator,
+            init_kwargs=self.tree_init_kwargs
+        )
+        pipeline = Pipeline([
+            ('validator', feature_validator),
+            ('woe_transformer', WoETransformer(binner=binner, dtype=np.float32))
+        ])
+        pipeline.fit(self.X, self.y)
+        transformed = pipeline.transform(self.X)
+
+        self.assertTrue((transformed.dtypes == np.float32).all())
+        np.testing.assert_allclose(
+            transformed.to_numpy(),
+            self.pipeline.fit(self.X, self.y).transform(self.X).to_numpy(),
+            rtol=1e-6
+        )
+
+    def test_fitting_with_quantile_binner(self):
+        feature_validator = FeatureValidator()
+        pipeline = Pipeline([
+            ('validator', feature_validator),
+            ('woe_transformer', WoETransformer(binner=QuantileBinner(feature_validator, max_bins=5)))
+        ])
+        pipeline.fit(self.X, self.y)
+        transformed = pipeline.transform(self.X)
+
+        self.assertEqual(transformed.shape, self.X.shape)
+        self.assertFalse(transformed.isnull().any().any())
+        self.assertTrue(
+            all(len(spec.bins) <= 5 for spec in pipeline['woe_transformer'].woe_spec.values())
+        )
+
+    def test_quantile_binner_with_categorical_column(self):
+        X = self.X.assign(category=np.where(np.arange(len(self.X)) % 3 == 0, "A", "B"))
+        feature_validator = FeatureValidator()
+        pipeline = Pipeline([
+            ('validator', feature_validator),
+            ('woe_transformer', WoETransformer(binner=QuantileBinner(feature_validator, max_bins=5)))
+        ])
+        pipeline.fit(X, self.y)
+        transformed = pipeline.transform(X)
+
+        self.assertFalse(transformed['category'].isnull().any())
+        self.assertEqual(
+            {bin.bin.categorical_indicators for bin in pipeline['woe_transformer'].woe_spec['category'].bins},
+            {frozenset({"A"}), frozenset({"B"})}
+        )
+
+    def test_sequential_and_parallel_transforms_agree(self):
+        feature_validator = FeatureValidator().fit(self.X)
+        transformed = []
+
+        for n_jobs in (1, -1):
+            binner = DecisionTreeBinner(
+                feature_validator=feature_validator,
+                init_kwargs=self.tree_init_kwargs
+            )
+            woe_transformer = WoETransformer(binner=binner, n_jobs=n_jobs).fit(self.X, self.y)
+            transformed.append(woe_transformer.transform(self.X))
+
+        self.assertTrue(transformed[0].equals(transformed[1]))
+
+    @unittest.skipIf(pickle.HIGHEST_PROTOCOL < 5, "pickle protocol 5 needs Python 3.8")
+    def test_pickled_transformer_transforms_the_same(self):
+        self.pipeline.fit(self.X, self.y)
+        buffers = []
+        pickled = pickle.dumps(self.pipeline['woe_transformer'], protocol=5, buffer_callback=buffers.append)
+        woe_transformer = pickle.loads(pickled, buffers=buffers)
+        validated = self.pipeline['validator'].transform(self.X)
+
+        self.assertGreater(len(buffers), 0)
+        self.assertTrue(
+            woe_transformer.transform(validated).equals(self.pipeline['woe_transformer'].transform(validated))
+        )
+
+    def test_replaced_woe_spec_is_applied(self):
+        feature_validator = FeatureValidator().fit(self.X)
+        binner = DecisionTreeBinner(
+            feature_validator=feature_validator,
+            init_kwargs=self.tree_init_kwargs
+        )
+        woe_transformer = WoETransformer(binner=binner).fit(self.X, self.y)
+        before = woe_transformer.transform(self.X)
+        spec = woe_transformer.woe_spec['mean radius']
+        woe_transformer.woe_spec['mean radius'] = attr.evolve(
+            spec,
+            bins=[attr.evolve(woe_bin, woe=woe_bin.woe + 1.) for woe_bin in spec.bins]
+        )
+        after = woe_transformer.transform(self.X)
+
+        np.testing.assert_allclose(after['mean radius'], before['mean radius'] + 1.)
+        self.assertTrue(after.drop(columns='mean radius').equals(before.drop(columns='mean radius')))
@@ -108,6 +108,35 @@ class DataModelConstructTests(unittest.TestCase):
                 }
             )
 
+    def test_nested_range_not_accepted(self):
+
+        with self.assertRaises(ValueError):
+            BinningSpec(
+                feature=Feature(
+                    name="feature",
+                    range=Range(
+                        numeric_range_start=0.,
+                        numeric_range_end=3.,
+                        categorical_indicators={"M"}
+                    )
+                ),
+                bins={
+                    Range(
+                        numeric_range_start=0.,
+                        numeric_range_end=2.,
+                        categorical_indicators={"M"}
+                    ),
+                    Range(
+                        numeric_range_start=1.,
+                        numeric_range_end=1.
+                    ),
+                    Range(
+                        numeric_range_start=2.,
+                        numeric_range_end=3.
+                    )
+                }
+            )
+
     def test_overlapping_categorical_not_accepted(self):
 
         with self.assertRaises(ValueError):
@@ -177,6 +206,56 @@ class DataModelConstructTests(unittest.TestCase):
             }
         )
 
+    def test_binning_spec_bins_are_sorted(self):
+        spec = BinningSpec(
+            feature=Feature(
+                name="feature",
+                range=Range(
+                    numeric_range_start=0.5,
+                    numeric_range_end=2.5,
+                    categorical_indicators={"M", "C"}
+                )
+            ),
+            bins=[
+                Range(categorical_indicators={"M"}),
+                Range(
+                    numeric_range_start=1.5,
+                    numeric_range_end=2.5
+                ),
+                Range(categorical_indicators={"C"}),
+                Range(
+                    numeric_range_start=0.5,
+                    numeric_range_end=1.5
+                )
+            ]
+        )
+
+        self.assertIsInstance(spec.bins, tuple)
+        self.assertEqual(
+            [(bin.numeric_range_start, bin.categorical_indicators) for bin in spec.bins],
+            [(0.5, frozenset()), (1.5, frozenset()), (None, frozenset({"C"})), (None, frozenset({"M"}))]
+        )
+
+    def test_binning_spec_collapses_repeated_bins(self):
+        spec = BinningSpec(
+            feature=Feature(
+                name="feature",
+                range=Range(
+                    numeric_range_start=0.5,
+                    numeric_range_end=2.5,
+                    categorical_indicators={"M"}
+                )
+            ),
+            bins=[
+                Range(numeric_range_start=0.5, numeric_range_end=1.5),
+                Range(numeric_range_start=0.5, numeric_range_end=1.5),
+                Range(numeric_range_start=1.5, numeric_range_end=2.5),
+                Range(categorical_indicators={"M"})
+            ]
+        )
+
+        self.assertEqual(len(spec.bins), 3)
+
     def test_woespec_with_valid_ranges_accepted(self):
         WoESpec(
             feature=Feature(
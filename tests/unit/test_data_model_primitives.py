@@ -3,6 +3,7 @@
 Data model primitive building block tests. Mainly checks that validation works as expected.
 """
 
+import numpy as np
 import unittest
 
 from pywoe.constants import INFINITY
@@ -76,6 +77,13 @@ class DataModelPrimitivesTests(unittest.TestCase):
             categorical_indicators=["a", "b", "c"]
         )
 
+    def test_range_accepts_ndarray(self):
+        categorical = Range(categorical_indicators=np.array(["a", "b", "a"], dtype=object))
+        empty = Range(categorical_indicators=np.array([], dtype=object))
+
+        self.assertEqual(categorical.categorical_indicators, frozenset({"a", "b"}))
+        self.assertIs(empty.categorical_indicators, Range().categorical_indicators)
+
     def test_feature_rejects_without_name(self):
 
         with self.assertRaises(TypeError):
@@ -155,3 +163,55 @@ class DataModelPrimitivesTests(unittest.TestCase):
                     categorical_indicators={"a", "b", "c"}
                 )
             )
+
+    def test_range_is_slotted_and_hashable(self):
+        first = Range(
+            numeric_range_start=10,
+            numeric_range_end=45,
+            categorical_indicators={"a", "b", "c"}
+        )
+        second = Range(
+            numeric_range_start=10.,
+            numeric_range_end=45.,
+            categorical_indicators=["c", "b", "a"]
+        )
+
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first, second}), 1)
+
+    def test_unchecked_range_equals_validated_range(self):
+        # `Range._unchecked` fills in the slot `attrs` caches the hash in, so this breaks if `attrs` changes it.
+        pairs = [
+            (
+                Range._unchecked(numeric_range_start=10., numeric_range_end=45., categorical_indicators={"a", "b"}),
+                Range(numeric_range_start=10, numeric_range_end=45, categorical_indicators={"a", "b"})
+            ),
+            (
+                Range._unchecked(categorical_indicators={"a"}),
+                Range(categorical_indicators={"a"})
+            )
+        ]
+
+        for unchecked, validated in pairs:
+            self.assertEqual(unchecked, validated)
+            self.assertEqual(hash(unchecked), hash(validated))
+            self.assertEqual(hash(unchecked), hash(unchecked))
+            self.assertEqual(len({unchecked, validated}), 1)
+
+    def test_passing_below_negative_infinity_does_not_work(self):
+
+        with self.assertRaises(ValueError):
+            Range(
+                numeric_range_start=-INFINITY,
+                numeric_range_end=10.,
+                categorical_indicators={"a", "b", "c"}
+            )
+
+    def test_range_shares_categorical_indicators(self):
+        first = Range(categorical_indicators={"a", "b"})
+        second = Range(categorical_indicators=["b", "a"])
+
+        self.assertIs(first.categorical_indicators, second.categorical_indicators)
+        self.assertIs(Range().categorical_indicators, Range(categorical_indicators=[]).categorical_indicators)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Feature engineering utility tests. Mainly checks that values are assigned to the right bins.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from pywoe.data_models.base import Range
+from pywoe.data_models.feature import Feature
+from pywoe.data_models.binning import BinningSpec
+from pywoe.feature_engineering.binning import _iteratively_merge_bins, _proportion_z_test_returning_p_value
+from pywoe.feature_engineering.utils import \
+    compile_binning, \
+    get_bin_indices, \
+    get_mask_from_range, \
+    prepare_series
+
+
+class FeatureEngineeringUtilsTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.bins = [
+            Range(categorical_indicators={"M"}),
+            Range(
+                numeric_range_start=1.5,
+                numeric_range_end=2.5
+            ),
+            Range(
+                numeric_range_start=0.5,
+                numeric_range_end=1.5,
+                categorical_indicators={"C"}
+            )
+        ]
+        cls.ser = pd.Series([0.7, 1.5, 1.6, 2.5, "M", "C", 3.0, "X", 0.5], dtype=object)
+
+    def test_bin_indices_match_masks(self):
+        bin_indices = get_bin_indices(prepare_series(self.ser), compile_binning(self.bins))
+
+        for i, bin in enumerate(self.bins):
+            np.testing.assert_array_equal(
+                bin_indices == i,
+                get_mask_from_range(self.ser, bin).to_numpy()
+            )
+
+    def test_values_outside_bins_are_not_assigned(self):
+        bin_indices = get_bin_indices(prepare_series(self.ser), compile_binning(self.bins))
+
+        np.testing.assert_array_equal(
+            bin_indices,
+            [2, 2, 1, 1, 0, 2, -1, -1, -1]
+        )
+
+    def test_similar_categorical_bins_are_merged(self):
+        random_state = np.random.RandomState(0)
+        values = np.array(["a", "b", "c", "d", 1.], dtype=object)
+        x = pd.Series(values[random_state.randint(0, len(values), 2000)])
+        event_rates = {"a": 0.1, "b": 0.11, "c": 0.5, "d": 0.52, 1.: 0.9}
+        y = pd.Series((random_state.rand(2000) < x.map(event_rates)).astype(int))
+        binning_spec = BinningSpec(
+            feature=Feature(
+                name="x",
+                range=Range(
+                    numeric_range_start=0.5,
+                    numeric_range_end=1.5,
+                    categorical_indicators={"a", "b", "c", "d"}
+                )
+            ),
+            bins=[Range(categorical_indicators={char}) for char in "abcd"] + [
+                Range(
+                    numeric_range_start=0.5,
+                    numeric_range_end=1.5
+                )
+            ]
+        )
+
+        merged = _iteratively_merge_bins(x, y, binning_spec)
+
+        self.assertEqual(
+            set(bin.categorical_indicators for bin in merged.bins),
+            {frozenset(), frozenset({"a", "b"}), frozenset({"c", "d"})}
+        )
+
+        # A test written for a single pair of bins at a time merges the same bins.
+        def scalar_stat_test(event_count_bin_1, event_count_bin_2, obs_count_bin_1, obs_count_bin_2):
+            self.assertEqual(np.ndim(event_count_bin_1), 0)
+            return float(
+                _proportion_z_test_returning_p_value(
+                    event_count_bin_1,
+                    event_count_bin_2,
+                    obs_count_bin_1,
+                    obs_count_bin_2
+                )
+            )
+
+        self.assertEqual(_iteratively_merge_bins(x, y, binning_spec, stat_test=scalar_stat_test), merged)
+
+    def test_z_test_is_run_for_every_pair(self):
+        p_values = _proportion_z_test_returning_p_value(
+            np.array([10, 5, 0]),
+            np.array([20, 50, 0]),
+            np.array([100, 60, 40]),
+            np.array([120, 70, 50])
+        )
+
+        np.testing.assert_allclose(p_values, [0.151361135, 3.89763439e-13, np.nan])
+
+    def test_single_bin_is_returned_as_is(self):
+        binning_spec = BinningSpec(
+            feature=Feature(
+                name="x",
+                range=Range(
+                    numeric_range_start=0.5,
+                    numeric_range_end=1.5
+                )
+            ),
+            bins=[
+                Range(
+                    numeric_range_start=0.5,
+                    numeric_range_end=1.5
+                )
+            ]
+        )
+
+        self.assertIs(
+            _iteratively_merge_bins(pd.Series([1.]), pd.Series([1]), binning_spec),
+            binning_spec
+        )
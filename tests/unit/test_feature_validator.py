@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Feature validator tests. Checks that values are converted and out-of-range values are reported.
+"""
+
+import unittest
+import pandas as pd
+
+from pywoe.feature_engineering.validator import FeatureValidator
+
+
+class FeatureValidatorTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.X = pd.DataFrame({
+            'feat_1': [18, 78, 'T', 45],
+            'feat_2': [567., 987., 123., 345.]
+        })
+        cls.feature_validator = FeatureValidator().fit(cls.X)
+
+    def test_values_are_converted(self):
+        validated = self.feature_validator.transform(self.X)
+
+        self.assertEqual(list(validated['feat_1']), [18., 78., 'T', 45.])
+        self.assertEqual(validated['feat_2'].dtype, float)
+
+    def test_all_violations_are_reported(self):
+        with self.assertRaises(ValueError) as context:
+            self.feature_validator.transform(
+                pd.DataFrame({
+                    'feat_1': [1, 'Q'],
+                    'feat_2': [567., 1000.]
+                })
+            )
+
+        self.assertEqual(len(str(context.exception).split("\n")), 3)